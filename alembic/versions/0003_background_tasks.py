@@ -0,0 +1,40 @@
+"""add background tasks queue and user data version"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_background_tasks"
+down_revision = "0002_priority"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("data_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    op.create_table(
+        "background_tasks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("run_after", sa.DateTime(), nullable=False),
+        sa.Column("locked_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_background_tasks_status_run_after",
+        "background_tasks",
+        ["status", "run_after"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_background_tasks_status_run_after", table_name="background_tasks")
+    op.drop_table("background_tasks")
+    op.drop_column("users", "data_version")
@@ -0,0 +1,57 @@
+"""add jobs archive and archive summary"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_jobs_archive"
+down_revision = "0003_background_tasks"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("company", sa.String(length=128), nullable=False),
+        sa.Column("position", sa.String(length=128), nullable=False),
+        sa.Column("source", sa.String(length=64), nullable=True),
+        sa.Column("salary", sa.String(length=64), nullable=True),
+        sa.Column("stack", sa.String(length=128), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("priority", sa.String(length=16), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("stage_id", sa.Integer(), nullable=False),
+        sa.Column("applied_at", sa.DateTime(), nullable=True),
+        sa.Column("hr_response_at", sa.DateTime(), nullable=True),
+        sa.Column("screening_at", sa.DateTime(), nullable=True),
+        sa.Column("tech_interview_at", sa.DateTime(), nullable=True),
+        sa.Column("homework_at", sa.DateTime(), nullable=True),
+        sa.Column("final_at", sa.DateTime(), nullable=True),
+        sa.Column("offer_at", sa.DateTime(), nullable=True),
+        sa.Column("rejected_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["stage_id"], ["stages.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+    )
+    op.create_index("ix_jobs_archive_user_id", "jobs_archive", ["user_id"])
+
+    op.create_table(
+        "jobs_archive_summary",
+        sa.Column("user_id", sa.Integer(), primary_key=True),
+        sa.Column("job_count", sa.Integer(), nullable=False),
+        sa.Column("stage_counts", sa.JSON(), nullable=False),
+        sa.Column("progress_counts", sa.JSON(), nullable=False),
+        sa.Column("hr_response_days_total", sa.Float(), nullable=False),
+        sa.Column("hr_response_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("jobs_archive_summary")
+    op.drop_index("ix_jobs_archive_user_id", table_name="jobs_archive")
+    op.drop_table("jobs_archive")
@@ -0,0 +1,64 @@
+"""add normalized stack tags and facet indexes"""
+
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_job_stack_tags"
+down_revision = "0004_jobs_archive"
+branch_labels = None
+depends_on = None
+
+_STACK_SEPARATORS = re.compile(r"[,;/|\n]+")
+
+
+def _normalize_stack(stack: str | None) -> list[str]:
+    """Копия `app.facets.normalize_stack` на момент миграции (не импортировать)."""
+    if not stack:
+        return []
+    tags = {" ".join(part.split()).lower() for part in _STACK_SEPARATORS.split(stack)}
+    tags.discard("")
+    return sorted(tags)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_stack_tags",
+        sa.Column("job_id", sa.Integer(), primary_key=True),
+        sa.Column("tag", sa.String(length=128), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+    )
+    op.create_index("ix_job_stack_tags_user_id_tag", "job_stack_tags", ["user_id", "tag"])
+
+    op.create_index("ix_jobs_user_id_source", "jobs", ["user_id", "source"])
+    op.create_index("ix_jobs_user_id_priority", "jobs", ["user_id", "priority"])
+    op.create_index("ix_jobs_user_id_stage_id", "jobs", ["user_id", "stage_id"])
+
+    tags_table = sa.table(
+        "job_stack_tags",
+        sa.column("job_id", sa.Integer),
+        sa.column("tag", sa.String),
+        sa.column("user_id", sa.Integer),
+    )
+    connection = op.get_bind()
+    for table_name in ("jobs", "jobs_archive"):
+        rows = connection.execute(
+            sa.text(f"SELECT id, user_id, stack FROM {table_name} WHERE stack IS NOT NULL")
+        ).all()
+        tags = [
+            {"job_id": job_id, "tag": tag, "user_id": user_id}
+            for job_id, user_id, stack in rows
+            for tag in _normalize_stack(stack)
+        ]
+        if tags:
+            op.bulk_insert(tags_table, tags)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_user_id_stage_id", table_name="jobs")
+    op.drop_index("ix_jobs_user_id_priority", table_name="jobs")
+    op.drop_index("ix_jobs_user_id_source", table_name="jobs")
+    op.drop_index("ix_job_stack_tags_user_id_tag", table_name="job_stack_tags")
+    op.drop_table("job_stack_tags")
@@ -0,0 +1,22 @@
+"""add rate limit buckets"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_rate_limit_buckets"
+down_revision = "0005_job_stack_tags"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rate_limit_buckets",
+        sa.Column("key", sa.String(length=128), primary_key=True),
+        sa.Column("tokens", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.Float(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rate_limit_buckets")
@@ -0,0 +1,52 @@
+"""add job change versions and tombstones for delta sync"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_job_changes"
+down_revision = "0006_rate_limit_buckets"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "jobs",
+        sa.Column("change_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "jobs_archive",
+        sa.Column("change_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_jobs_user_id_change_version", "jobs", ["user_id", "change_version"])
+
+    op.create_table(
+        "job_tombstones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("change_version", sa.Integer(), nullable=False),
+        sa.Column("reason", sa.String(length=16), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+    )
+    op.create_index(
+        "ix_job_tombstones_user_id_change_version",
+        "job_tombstones",
+        ["user_id", "change_version"],
+    )
+
+    # Существующие заявки получают версию >= 1, чтобы попасть в выборку since=0.
+    op.execute("UPDATE users SET data_version = data_version + 1")
+    op.execute(
+        "UPDATE jobs SET change_version = "
+        "(SELECT data_version FROM users WHERE users.id = jobs.user_id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_tombstones_user_id_change_version", table_name="job_tombstones")
+    op.drop_table("job_tombstones")
+    op.drop_index("ix_jobs_user_id_change_version", table_name="jobs")
+    op.drop_column("jobs_archive", "change_version")
+    op.drop_column("jobs", "change_version")
@@ -0,0 +1,34 @@
+"""never reuse job ids on sqlite"""
+
+from alembic import op
+
+revision = "0008_jobs_autoincrement"
+down_revision = "0007_job_changes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # В Postgres id берется из sequence и и так не переиспользуется.
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    with op.batch_alter_table(
+        "jobs", recreate="always", table_kwargs={"sqlite_autoincrement": True}
+    ):
+        pass
+    # Счетчик начинается после всех выданных id, включая уже архивированные заявки.
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'jobs'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) "
+        "SELECT 'jobs', COALESCE(MAX(id), 0) "
+        "FROM (SELECT id FROM jobs UNION ALL SELECT id FROM jobs_archive)"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    with op.batch_alter_table(
+        "jobs", recreate="always", table_kwargs={"sqlite_autoincrement": False}
+    ):
+        pass
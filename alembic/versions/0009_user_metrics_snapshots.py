@@ -0,0 +1,24 @@
+"""add persisted user metrics snapshots"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009_user_metrics_snapshots"
+down_revision = "0008_jobs_autoincrement"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_metrics_snapshots",
+        sa.Column("user_id", sa.Integer(), primary_key=True),
+        sa.Column("data_version", sa.Integer(), nullable=False),
+        sa.Column("metrics", sa.JSON(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_metrics_snapshots")
@@ -0,0 +1,52 @@
+"""Admission control: отказ запросам, когда очередь ожидания пула БД слишком длинная."""
+
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class PoolOverloaded(Exception):
+    """Очередь ожидания соединения из пула превысила порог."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Database pool is saturated.")
+        self.retry_after = retry_after
+
+
+class PoolAdmission:
+    """Счетчик запросов, ждущих соединение из пула SQLAlchemy в этом процессе.
+
+    `QueuePool` не показывает длину своей очереди, поэтому ожидание
+    считается вокруг явного checkout соединения в `get_db`.
+    """
+
+    def __init__(self, max_waiting: int, retry_after: int) -> None:
+        self.max_waiting = max_waiting
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        """Текущее число ожидающих запросов."""
+        return self._waiting
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """Встать в очередь за соединением или сразу отказать."""
+        with self._lock:
+            if self._waiting >= self.max_waiting:
+                raise PoolOverloaded(self.retry_after)
+            self._waiting += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+
+pool_admission = PoolAdmission(
+    max_waiting=int(os.getenv("DB_POOL_MAX_WAITING", "10")),
+    retry_after=int(os.getenv("DB_POOL_RETRY_AFTER", "2")),
+)
@@ -0,0 +1,130 @@
+"""Перенос заявок в терминальных этапах из горячей таблицы в архив."""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, delete, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from .models import (
+    STAGE_DATE_MAP,
+    Job,
+    JobArchive,
+    JobArchiveSummary,
+    JobTombstone,
+    Stage,
+    User,
+)
+
+_JOB_COLUMNS = [column.name for column in Job.__table__.columns]
+
+
+def _merge_into_summary(db: Session, user_id: int, jobs: list[Job]) -> None:
+    """Добавить агрегаты пачки заявок к сводке архива пользователя."""
+    summary = db.get(JobArchiveSummary, user_id, with_for_update=True)
+    if summary is None:
+        summary = JobArchiveSummary(
+            user_id=user_id,
+            job_count=0,
+            stage_counts={},
+            progress_counts={},
+            hr_response_days_total=0.0,
+            hr_response_count=0,
+        )
+        db.add(summary)
+
+    stage_counts = dict(summary.stage_counts)
+    progress_counts = dict(summary.progress_counts)
+    for job in jobs:
+        key = str(job.stage_id)
+        stage_counts[key] = stage_counts.get(key, 0) + 1
+        for date_field in STAGE_DATE_MAP.values():
+            if getattr(job, date_field) is not None:
+                progress_counts[date_field] = progress_counts.get(date_field, 0) + 1
+        if job.applied_at is not None and job.hr_response_at is not None:
+            summary.hr_response_days_total += (
+                job.hr_response_at - job.applied_at
+            ).total_seconds() / 86400
+            summary.hr_response_count += 1
+
+    summary.job_count += len(jobs)
+    summary.stage_counts = stage_counts
+    summary.progress_counts = progress_counts
+
+
+def archive_terminal_jobs_batch(db: Session, older_than: timedelta, batch_size: int) -> int:
+    """Перенести одну пачку заявок в архив в отдельной транзакции.
+
+    Берутся заявки в терминальных этапах, не менявшиеся дольше `older_than`.
+    Вставка в архив, обновление сводки и удаление из `jobs` коммитятся
+    вместе, поэтому прерванный прогон можно просто запустить заново.
+    Возвращает количество перенесенных заявок.
+    """
+    cutoff = datetime.utcnow() - older_than
+    jobs = (
+        db.execute(
+            select(Job)
+            .join(Stage, Stage.id == Job.stage_id)
+            .where(Stage.is_terminal.is_(True), Job.updated_at < cutoff)
+            .order_by(Job.id.asc())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True, of=Job)
+        )
+        .scalars()
+        .all()
+    )
+    if not jobs:
+        return 0
+
+    job_ids = [job.id for job in jobs]
+    now = datetime.utcnow()
+    db.execute(
+        insert(JobArchive).from_select(
+            [*_JOB_COLUMNS, "archived_at"],
+            select(*Job.__table__.columns, literal(now, DateTime)).where(Job.id.in_(job_ids)),
+        )
+    )
+
+    jobs_by_user: dict[int, list[Job]] = {}
+    for job in jobs:
+        jobs_by_user.setdefault(job.user_id, []).append(job)
+    for user_id, user_jobs in jobs_by_user.items():
+        _merge_into_summary(db, user_id, user_jobs)
+    versions = dict(
+        db.execute(
+            update(User)
+            .where(User.id.in_(jobs_by_user))
+            .values(data_version=User.data_version + 1)
+            .returning(User.id, User.data_version)
+        ).all()
+    )
+    db.add_all(
+        JobTombstone(
+            job_id=job.id,
+            user_id=job.user_id,
+            change_version=versions[job.user_id],
+            reason="archived",
+        )
+        for job in jobs
+    )
+
+    db.execute(delete(Job).where(Job.id.in_(job_ids)))
+    db.commit()
+    return len(job_ids)
+
+
+def archive_terminal_jobs(
+    db: Session,
+    older_than: timedelta,
+    batch_size: int = 500,
+    max_batches: int | None = None,
+) -> int:
+    """Архивировать заявки пачками, пока они не закончатся или не выйдет лимит."""
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_terminal_jobs_batch(db, older_than, batch_size)
+        if not moved:
+            break
+        total += moved
+        batches += 1
+    return total
@@ -0,0 +1,38 @@
+"""Кэши производных данных пользователя."""
+
+import threading
+from collections import OrderedDict
+from typing import Any
+
+
+class VersionedCache:
+    """LRU-кэш, запись которого валидна только для своей версии данных.
+
+    Версия берется из `User.data_version`, поэтому устаревшие значения
+    отбрасываются без явной инвалидации, в том числе между воркерами.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Any, tuple[int, Any]] = OrderedDict()
+
+    def get(self, key: Any, version: int) -> Any | None:
+        """Вернуть значение, если оно посчитано для версии `version`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Any, version: int, value: Any) -> None:
+        """Сохранить значение для версии `version`."""
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current[0] > version:
+                return
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,82 @@
+"""Векторизованные матрицы конверсии по когортам дат отклика."""
+
+from dataclasses import dataclass
+from typing import Literal
+
+import numpy as np
+
+CohortBucket = Literal["week", "month"]
+
+# 1970-01-01 — четверг, до ближайшего понедельника 3 дня.
+_EPOCH_TO_MONDAY_DAYS = 3
+_SECONDS_PER_DAY = 86400
+
+
+@dataclass
+class CohortMatrix:
+    """Когорты (строки) × этапы (колонки)."""
+
+    period_starts: np.ndarray
+    sizes: np.ndarray
+    reached: dict[str, np.ndarray]
+    median_days: dict[str, np.ndarray]
+
+
+def _bucket_starts(applied: np.ndarray, bucket: CohortBucket) -> np.ndarray:
+    days = np.floor(applied / _SECONDS_PER_DAY).astype(np.int64).astype("datetime64[D]")
+    if bucket == "month":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    day_numbers = days.astype(np.int64)
+    return (day_numbers - (day_numbers + _EPOCH_TO_MONDAY_DAYS) % 7).astype("datetime64[D]")
+
+
+def _grouped_median(values: np.ndarray, groups: np.ndarray, group_count: int) -> np.ndarray:
+    """Медиана `values` внутри каждой группы без цикла по строкам; NaN пропускаются."""
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    sizes = np.bincount(groups, minlength=group_count)
+    starts = np.cumsum(sizes) - sizes
+    valid = np.bincount(groups, weights=~np.isnan(values), minlength=group_count).astype(np.int64)
+
+    medians = np.full(group_count, np.nan)
+    has_values = valid > 0
+    low = starts[has_values] + (valid[has_values] - 1) // 2
+    high = starts[has_values] + valid[has_values] // 2
+    medians[has_values] = (sorted_values[low] + sorted_values[high]) / 2
+    return medians
+
+
+def build_cohort_matrix(
+    applied: np.ndarray,
+    stage_columns: dict[str, np.ndarray],
+    bucket: CohortBucket,
+) -> CohortMatrix:
+    """Сгруппировать заявки по периоду `applied` и посчитать охват этапов.
+
+    Все колонки — секунды Unix epoch (`float64`), пустое время — NaN.
+    Для каждой когорты и каждой колонки этапа считается число заявок с
+    заполненным временем этапа и медиана дней от отклика до него.
+    Строки без `applied` в когорты не попадают.
+    """
+    has_applied = ~np.isnan(applied)
+    applied = applied[has_applied]
+    period_starts, groups = np.unique(_bucket_starts(applied, bucket), return_inverse=True)
+    group_count = len(period_starts)
+    sizes = np.bincount(groups, minlength=group_count)
+
+    reached: dict[str, np.ndarray] = {}
+    median_days: dict[str, np.ndarray] = {}
+    for name, column in stage_columns.items():
+        column = column[has_applied]
+        days = (column - applied) / _SECONDS_PER_DAY
+        reached[name] = np.bincount(
+            groups, weights=~np.isnan(column), minlength=group_count
+        ).astype(np.int64)
+        median_days[name] = _grouped_median(days, groups, group_count)
+
+    return CohortMatrix(
+        period_starts=period_starts,
+        sizes=sizes,
+        reached=reached,
+        median_days=median_days,
+    )
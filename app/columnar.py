@@ -0,0 +1,50 @@
+"""Компактный колоночный формат списка заявок."""
+
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from typing import Any
+
+from .schemas import JobOut
+
+DICTIONARY_COLUMNS = ("user_id", "stage_id", "company", "source", "priority")
+TIMESTAMP_COLUMNS = tuple(name for name in JobOut.model_fields if name.endswith("_at"))
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch_micros(value: datetime | None) -> int | None:
+    """Naive-время в БД хранится в UTC; микросекунды сохраняются без потерь."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def encode_jobs_columnar(jobs: Iterable[Any]) -> dict[str, Any]:
+    """Представить заявки как массивы колонок.
+
+    Повторяющиеся значения из `DICTIONARY_COLUMNS` заменяются индексами в
+    `dictionaries[column]`, время — целыми микросекундами Unix epoch (UTC).
+    """
+    columns: dict[str, list[Any]] = {name: [] for name in JobOut.model_fields}
+    dictionaries: dict[str, list[Any]] = {name: [] for name in DICTIONARY_COLUMNS}
+    codes: dict[str, dict[Any, int]] = {name: {} for name in DICTIONARY_COLUMNS}
+
+    count = 0
+    for job in jobs:
+        count += 1
+        for name, values in columns.items():
+            value = getattr(job, name)
+            if name in codes:
+                column_codes = codes[name]
+                code = column_codes.get(value)
+                if code is None:
+                    code = column_codes[value] = len(dictionaries[name])
+                    dictionaries[name].append(value)
+                value = code
+            elif name in TIMESTAMP_COLUMNS:
+                value = _to_epoch_micros(value)
+            values.append(value)
+
+    return {"format": "columnar", "count": count, "dictionaries": dictionaries, "columns": columns}
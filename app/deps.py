@@ -1,13 +1,30 @@
 """Зависимости FastAPI."""
 
 from collections.abc import Generator
+
+from fastapi import HTTPException
+
+from .admission import PoolOverloaded, pool_admission
 from .db import SessionLocal
 
 
 def get_db() -> Generator:
-    """Предоставить сессию БД на время запроса."""
+    """Предоставить сессию БД на время запроса.
+
+    Соединение берется из пула сразу: если ждущих уже слишком много,
+    запрос отклоняется с 503 и `Retry-After`, а не занимает поток в очереди.
+    """
     db = SessionLocal()
     try:
+        try:
+            with pool_admission.admit():
+                db.connection()
+        except PoolOverloaded as exc:
+            raise HTTPException(
+                status_code=503,
+                detail="Service is overloaded, retry later.",
+                headers={"Retry-After": str(exc.retry_after)},
+            ) from exc
         yield db
     finally:
         db.close()
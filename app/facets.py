@@ -0,0 +1,96 @@
+"""Нормализованные теги стека и фасетные счетчики заявок."""
+
+import re
+
+from sqlalchemy import Integer, cast, delete, func, literal, null, select, union_all
+from sqlalchemy.orm import Session
+
+from .models import Job, JobStackTag, Stage
+from .schemas import FacetCount, JobFacetsOut, StageFacetCount
+
+_STACK_SEPARATORS = re.compile(r"[,;/|\n]+")
+
+
+def normalize_stack(stack: str | None) -> list[str]:
+    """Разбить свободный текст стека на уникальные теги в нижнем регистре."""
+    if not stack:
+        return []
+    tags = {
+        " ".join(part.split()).lower()
+        for part in _STACK_SEPARATORS.split(stack)
+    }
+    tags.discard("")
+    return sorted(tags)
+
+
+def sync_stack_tags(db: Session, job: Job) -> None:
+    """Пересобрать теги заявки по текущему значению `stack`.
+
+    Вызывается в той же транзакции, что и запись заявки; `job.id` должен
+    быть уже назначен (после flush).
+    """
+    db.execute(delete(JobStackTag).where(JobStackTag.job_id == job.id))
+    db.add_all(
+        JobStackTag(job_id=job.id, user_id=job.user_id, tag=tag)
+        for tag in normalize_stack(job.stack)
+    )
+
+
+def stack_filter(user_id: int, tags: list[str]):
+    """Подзапрос id заявок, у которых есть хотя бы один из тегов."""
+    normalized = sorted({tag for value in tags for tag in normalize_stack(value)})
+    return select(JobStackTag.job_id).where(
+        JobStackTag.user_id == user_id,
+        JobStackTag.tag.in_(normalized),
+    )
+
+
+def get_job_facets(db: Session, user_id: int) -> JobFacetsOut:
+    """Посчитать фасеты горячей таблицы одним запросом (UNION ALL группировок).
+
+    Значения фасетов совпадают с параметрами фильтров `GET /jobs`: этап
+    отдается по `stage_id` (с названием для подписи), заявки без источника
+    или приоритета в фасеты не попадают — выбрать их фильтром нельзя.
+    """
+    no_stage = cast(null(), Integer)
+    by_source = (
+        select(
+            literal("source").label("facet"),
+            Job.source.label("value"),
+            no_stage.label("stage_id"),
+            func.count(Job.id),
+        )
+        .where(Job.user_id == user_id, Job.source.is_not(None))
+        .group_by(Job.source)
+    )
+    by_priority = (
+        select(literal("priority"), Job.priority, no_stage, func.count(Job.id))
+        .where(Job.user_id == user_id, Job.priority.is_not(None))
+        .group_by(Job.priority)
+    )
+    by_stage = (
+        select(literal("stage"), Stage.name, Stage.id, func.count(Job.id))
+        .join(Stage, Stage.id == Job.stage_id)
+        .where(Job.user_id == user_id)
+        .group_by(Stage.id, Stage.name)
+    )
+    by_stack = (
+        select(literal("stack"), JobStackTag.tag, no_stage, func.count(JobStackTag.job_id))
+        .join(Job, Job.id == JobStackTag.job_id)
+        .where(JobStackTag.user_id == user_id)
+        .group_by(JobStackTag.tag)
+    )
+
+    values: dict[str, list[FacetCount]] = {"source": [], "priority": [], "stack": []}
+    stages: list[StageFacetCount] = []
+    for facet, value, stage_id, count in db.execute(
+        union_all(by_source, by_priority, by_stage, by_stack)
+    ).all():
+        if facet == "stage":
+            stages.append(StageFacetCount(stage_id=stage_id, stage_name=value, count=count))
+        else:
+            values[facet].append(FacetCount(value=value, count=count))
+    for counts in values.values():
+        counts.sort(key=lambda item: (-item.count, item.value))
+    stages.sort(key=lambda item: (-item.count, item.stage_name))
+    return JobFacetsOut(**values, stage=stages)
@@ -1,10 +1,21 @@
 """Модели базы данных для трекера воронки поиска работы."""
 
 from datetime import datetime
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, Boolean
+from sqlalchemy import JSON, Boolean, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .db import Base
 
+STAGE_DATE_MAP = {
+    "Applied": "applied_at",
+    "HR Response": "hr_response_at",
+    "Screening": "screening_at",
+    "Tech Interview": "tech_interview_at",
+    "Homework": "homework_at",
+    "Final": "final_at",
+    "Offer": "offer_at",
+    "Rejected": "rejected_at",
+}
+
 
 class Stage(Base):
     """Определение этапа воронки."""
@@ -30,6 +41,7 @@ class User(Base):
     name: Mapped[str | None] = mapped_column(String(128), nullable=True)
     provider: Mapped[str | None] = mapped_column(String(32), nullable=True)
     provider_sub: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    data_version: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     jobs: Mapped[list["Job"]] = relationship("Job", back_populates="user")
@@ -64,6 +76,138 @@ class Job(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
+    change_version: Mapped[int] = mapped_column(Integer, default=0)
 
     stage: Mapped[Stage] = relationship("Stage", back_populates="jobs")
     user: Mapped[User] = relationship("User", back_populates="jobs")
+
+    __table_args__ = (
+        Index("ix_jobs_user_id_source", "user_id", "source"),
+        Index("ix_jobs_user_id_priority", "user_id", "priority"),
+        Index("ix_jobs_user_id_stage_id", "user_id", "stage_id"),
+        Index("ix_jobs_user_id_change_version", "user_id", "change_version"),
+        # Архив, теги и tombstones ссылаются на id заявки, поэтому SQLite не должен
+        # выдавать id удаленной строки заново (без AUTOINCREMENT он берет max(rowid)+1).
+        {"sqlite_autoincrement": True},
+    )
+
+
+class JobTombstone(Base):
+    """Отметка об удалении заявки из горячей таблицы для delta-синхронизации."""
+
+    __tablename__ = "job_tombstones"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    job_id: Mapped[int] = mapped_column(Integer)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    change_version: Mapped[int] = mapped_column(Integer)
+    reason: Mapped[str] = mapped_column(String(16))
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_job_tombstones_user_id_change_version", "user_id", "change_version"),
+    )
+
+
+class JobStackTag(Base):
+    """Нормализованный тег стека заявки для фасетов и фильтров.
+
+    Строки не удаляются при архивации: `id` заявки в архиве сохраняется.
+    """
+
+    __tablename__ = "job_stack_tags"
+
+    job_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    tag: Mapped[str] = mapped_column(String(128), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+
+    __table_args__ = (Index("ix_job_stack_tags_user_id_tag", "user_id", "tag"),)
+
+
+class JobArchive(Base):
+    """Заявка в терминальном этапе, вынесенная из горячей таблицы `jobs`.
+
+    Колонки повторяют `Job`, `id` сохраняется исходным.
+    """
+
+    __tablename__ = "jobs_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    company: Mapped[str] = mapped_column(String(128))
+    position: Mapped[str] = mapped_column(String(128))
+    source: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    salary: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    stack: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    priority: Mapped[str | None] = mapped_column(String(16), nullable=True)
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    stage_id: Mapped[int] = mapped_column(ForeignKey("stages.id"))
+    applied_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    hr_response_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    screening_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    tech_interview_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    homework_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    final_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    offer_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    rejected_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+    updated_at: Mapped[datetime] = mapped_column(DateTime)
+    change_version: Mapped[int] = mapped_column(Integer, default=0)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class JobArchiveSummary(Base):
+    """Предпосчитанные агрегаты архивных заявок пользователя для метрик."""
+
+    __tablename__ = "jobs_archive_summary"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    job_count: Mapped[int] = mapped_column(Integer, default=0)
+    stage_counts: Mapped[dict] = mapped_column(JSON, default=dict)
+    progress_counts: Mapped[dict] = mapped_column(JSON, default=dict)
+    hr_response_days_total: Mapped[float] = mapped_column(Float, default=0.0)
+    hr_response_count: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+class UserMetricsSnapshot(Base):
+    """Метрики пользователя, посчитанные фоновой задачей; общие для всех воркеров."""
+
+    __tablename__ = "user_metrics_snapshots"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    data_version: Mapped[int] = mapped_column(Integer)
+    metrics: Mapped[dict] = mapped_column(JSON)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class BackgroundTask(Base):
+    """Задача фоновой очереди (durable-бэкенд)."""
+
+    __tablename__ = "background_tasks"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(64))
+    payload: Mapped[dict] = mapped_column(JSON, default=dict)
+    status: Mapped[str] = mapped_column(String(16), default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    run_after: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    locked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_background_tasks_status_run_after", "status", "run_after"),)
+
+
+class RateLimitBucket(Base):
+    """Корзина token bucket общего (database) бэкенда rate limiting."""
+
+    __tablename__ = "rate_limit_buckets"
+
+    key: Mapped[str] = mapped_column(String(128), primary_key=True)
+    tokens: Mapped[float] = mapped_column(Float)
+    updated_at: Mapped[float] = mapped_column(Float)
@@ -0,0 +1,138 @@
+"""Пользовательский rate limiting по алгоритму token bucket."""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from .db import SessionLocal
+from .models import RateLimitBucket
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Бюджет запросов: `capacity` токенов, пополнение `rate` токенов в секунду."""
+
+    capacity: float
+    rate: float
+
+    @classmethod
+    def parse(cls, value: str) -> "Budget":
+        """Разобрать строку вида `<запросов>/<секунд>`, например `20/60`."""
+        requests, _, seconds = value.partition("/")
+        capacity = float(requests)
+        return cls(capacity=capacity, rate=capacity / float(seconds or 1))
+
+
+def _refill(tokens: float, updated_at: float, now: float, budget: Budget) -> float:
+    return min(budget.capacity, tokens + max(0.0, now - updated_at) * budget.rate)
+
+
+def _retry_after(tokens: float, budget: Budget) -> float:
+    return (1.0 - tokens) / budget.rate
+
+
+class InMemoryRateLimitBackend:
+    """Корзины в памяти процесса: лимит считается отдельно на каждый воркер."""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self._max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def take(self, key: str, budget: Budget) -> float:
+        """Взять токен; вернуть 0 или сколько секунд ждать следующего."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (budget.capacity, now))
+            tokens = _refill(tokens, updated_at, now, budget)
+            retry_after = 0.0
+            if tokens >= 1.0:
+                tokens -= 1.0
+            else:
+                retry_after = _retry_after(tokens, budget)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self._max_keys:
+                self._evict_oldest()
+        return retry_after
+
+    def _evict_oldest(self) -> None:
+        oldest = sorted(self._buckets, key=lambda item: self._buckets[item][1])
+        for key in oldest[: len(oldest) // 10 or 1]:
+            del self._buckets[key]
+
+
+class DatabaseRateLimitBackend:
+    """Общие для всех воркеров корзины в таблице `rate_limit_buckets`."""
+
+    def __init__(self, session_factory: sessionmaker = SessionLocal) -> None:
+        self._session_factory = session_factory
+
+    def take(self, key: str, budget: Budget) -> float:
+        """Взять токен под блокировкой строки корзины."""
+        try:
+            return self._take(key, budget)
+        except IntegrityError:
+            # Корзину одновременно создал другой воркер — повторить с ней.
+            return self._take(key, budget)
+
+    def _take(self, key: str, budget: Budget) -> float:
+        now = time.time()
+        with self._session_factory() as db:
+            bucket = db.get(RateLimitBucket, key, with_for_update=True)
+            if bucket is None:
+                bucket = RateLimitBucket(key=key, tokens=budget.capacity, updated_at=now)
+                db.add(bucket)
+            tokens = _refill(bucket.tokens, bucket.updated_at, now, budget)
+            retry_after = 0.0
+            if tokens >= 1.0:
+                tokens -= 1.0
+            else:
+                retry_after = _retry_after(tokens, budget)
+            bucket.tokens = tokens
+            bucket.updated_at = now
+            db.commit()
+        return retry_after
+
+
+class RateLimiter:
+    """Набор именованных бюджетов поверх общего бэкенда."""
+
+    def __init__(
+        self,
+        backend: InMemoryRateLimitBackend | DatabaseRateLimitBackend,
+        budgets: dict[str, Budget],
+    ) -> None:
+        self.backend = backend
+        self.budgets = budgets
+
+    def check(self, budget_name: str, user_id: int) -> float:
+        """Списать запрос пользователя из бюджета; вернуть Retry-After или 0."""
+        budget = self.budgets[budget_name]
+        return self.backend.take(f"{budget_name}:{user_id}", budget)
+
+
+def _build_rate_limiter() -> RateLimiter:
+    """Создать лимитер на основе переменных окружения RATE_LIMIT_*."""
+    backend_name = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    if backend_name == "database":
+        backend: InMemoryRateLimitBackend | DatabaseRateLimitBackend = (
+            DatabaseRateLimitBackend()
+        )
+    elif backend_name == "memory":
+        backend = InMemoryRateLimitBackend()
+    else:
+        raise RuntimeError(f"Unknown RATE_LIMIT_BACKEND: {backend_name}")
+    return RateLimiter(
+        backend,
+        budgets={
+            "cheap": Budget.parse(os.getenv("RATE_LIMIT_CHEAP", "300/60")),
+            "expensive": Budget.parse(os.getenv("RATE_LIMIT_EXPENSIVE", "20/60")),
+        },
+    )
+
+
+rate_limiter = _build_rate_limiter()
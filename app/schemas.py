@@ -1,6 +1,8 @@
 """Pydantic-схемы для запросов и ответов API."""
 
-from datetime import datetime
+from datetime import date, datetime
+from typing import Literal
+
 from pydantic import BaseModel, ConfigDict
 
 
@@ -93,6 +95,40 @@ class JobOut(JobBase):
     stage_id: int
     created_at: datetime
     updated_at: datetime
+    change_version: int
+
+
+class JobTombstoneOut(BaseModel):
+    """Заявка, удаленная из горячей таблицы после курсора."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    job_id: int
+    reason: str
+    change_version: int
+
+
+class JobChangesOut(BaseModel):
+    """Изменения заявок после курсора и новый курсор."""
+
+    cursor: int
+    jobs: list[JobOut]
+    tombstones: list[JobTombstoneOut]
+
+
+class JobsColumnarOut(BaseModel):
+    """Список заявок в колоночном формате (`?format=columnar`).
+
+    `columns` — массив на каждое поле `JobOut`; поля из `dictionaries`
+    содержат индексы в словарь, `*_at` — микросекунды Unix epoch (UTC).
+    `cursor` — значение для следующего `/jobs/changes?since=`.
+    """
+
+    format: Literal["columnar"]
+    count: int
+    cursor: int
+    dictionaries: dict[str, list[int | str | None]]
+    columns: dict[str, list[int | str | None]]
 
 
 class StageCount(BaseModel):
@@ -128,3 +164,52 @@ class MetricsOut(BaseModel):
     stage_progress: list[StageProgress]
     conversions: list[ConversionMetric]
     avg_hr_response_days: float | None
+
+
+class FacetCount(BaseModel):
+    """Значение фасета и количество заявок с ним."""
+
+    value: str
+    count: int
+
+
+class StageFacetCount(BaseModel):
+    """Этап (значение для фильтра `stage_id`) и количество заявок на нем."""
+
+    stage_id: int
+    stage_name: str
+    count: int
+
+
+class JobFacetsOut(BaseModel):
+    """Фасетные счетчики для фильтров доски."""
+
+    source: list[FacetCount]
+    priority: list[FacetCount]
+    stack: list[FacetCount]
+    stage: list[StageFacetCount]
+
+
+class CohortStage(BaseModel):
+    """Охват этапа внутри когорты."""
+
+    stage_id: int
+    stage_name: str
+    reached: int
+    conversion_rate: float
+    median_days: float | None
+
+
+class Cohort(BaseModel):
+    """Когорта заявок, откликнувшихся в одном периоде."""
+
+    period_start: date
+    size: int
+    stages: list[CohortStage]
+
+
+class CohortsOut(BaseModel):
+    """Матрица конверсии по когортам."""
+
+    bucket: Literal["week", "month"]
+    cohorts: list[Cohort]
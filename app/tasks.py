@@ -0,0 +1,367 @@
+"""Фоновая очередь задач для производных вычислений после записи."""
+
+import asyncio
+import logging
+import os
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import and_, delete, event, or_, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from .db import SessionLocal
+from .models import BackgroundTask
+
+logger = logging.getLogger(__name__)
+
+TaskHandler = Callable[[dict[str, Any]], None]
+
+_PENDING_KEY = "pending_tasks"
+
+
+@dataclass
+class QueuedTask:
+    """Задача, поставленная в очередь или выданная воркеру."""
+
+    name: str
+    payload: dict[str, Any]
+    attempts: int = 0
+    id: int | None = None
+    run_after: datetime = field(default_factory=datetime.utcnow)
+
+
+class InMemoryTaskBackend:
+    """Очередь в памяти процесса (для разработки и одного воркера)."""
+
+    durable = False
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tasks: list[QueuedTask] = []
+
+    def stage(self, db: Session, task: QueuedTask) -> None:
+        """Ничего не писать в БД: задача попадёт в очередь после commit."""
+
+    def push(self, task: QueuedTask) -> None:
+        """Добавить задачу в очередь."""
+        with self._lock:
+            self._tasks.append(task)
+
+    def claim(self, limit: int) -> list[QueuedTask]:
+        """Забрать до `limit` готовых к запуску задач."""
+        now = datetime.utcnow()
+        with self._lock:
+            ready = [task for task in self._tasks if task.run_after <= now][:limit]
+            for task in ready:
+                self._tasks.remove(task)
+                task.attempts += 1
+        return ready
+
+    def complete(self, task: QueuedTask) -> None:
+        """Задача выполнена: хранить нечего."""
+
+    def retry(self, task: QueuedTask, error: str, run_after: datetime) -> None:
+        """Вернуть задачу в очередь с отложенным запуском."""
+        task.run_after = run_after
+        self.push(task)
+
+    def fail(self, task: QueuedTask, error: str) -> None:
+        """Отбросить задачу после исчерпания попыток."""
+
+    def pending(self) -> int:
+        """Количество задач, ожидающих запуска."""
+        with self._lock:
+            return len(self._tasks)
+
+
+class DatabaseTaskBackend:
+    """Durable-очередь в таблице `background_tasks` (`FOR UPDATE SKIP LOCKED`)."""
+
+    durable = True
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        visibility_timeout: float = 300.0,
+    ) -> None:
+        self._session_factory = session_factory
+        self._visibility_timeout = timedelta(seconds=visibility_timeout)
+
+    def stage(self, db: Session, task: QueuedTask) -> None:
+        """Записать задачу в той же транзакции, что и основное изменение."""
+        db.add(
+            BackgroundTask(
+                name=task.name,
+                payload=task.payload,
+                status="pending",
+                run_after=task.run_after,
+            )
+        )
+
+    def push(self, task: QueuedTask) -> None:
+        """Задача уже сохранена в `stage`."""
+
+    def claim(self, limit: int) -> list[QueuedTask]:
+        """Заблокировать и забрать готовые задачи, пропуская чужие блокировки.
+
+        Задачи в статусе `running`, чей воркер не отчитался дольше
+        `visibility_timeout`, считаются потерянными и выдаются повторно.
+        """
+        now = datetime.utcnow()
+        with self._session_factory() as db:
+            rows = (
+                db.execute(
+                    select(BackgroundTask)
+                    .where(
+                        or_(
+                            and_(
+                                BackgroundTask.status == "pending",
+                                BackgroundTask.run_after <= now,
+                            ),
+                            and_(
+                                BackgroundTask.status == "running",
+                                BackgroundTask.locked_at < now - self._visibility_timeout,
+                            ),
+                        )
+                    )
+                    .order_by(BackgroundTask.id.asc())
+                    .limit(limit)
+                    .with_for_update(skip_locked=True)
+                )
+                .scalars()
+                .all()
+            )
+            tasks = []
+            for row in rows:
+                row.status = "running"
+                row.locked_at = now
+                row.attempts += 1
+                tasks.append(
+                    QueuedTask(
+                        name=row.name,
+                        payload=row.payload,
+                        attempts=row.attempts,
+                        id=row.id,
+                    )
+                )
+            db.commit()
+        return tasks
+
+    def complete(self, task: QueuedTask) -> None:
+        """Удалить выполненную задачу."""
+        with self._session_factory() as db:
+            db.execute(delete(BackgroundTask).where(BackgroundTask.id == task.id))
+            db.commit()
+
+    def retry(self, task: QueuedTask, error: str, run_after: datetime) -> None:
+        """Вернуть задачу в `pending` с отложенным запуском."""
+        self._set_status(task, "pending", error, run_after=run_after)
+
+    def fail(self, task: QueuedTask, error: str) -> None:
+        """Пометить задачу как окончательно упавшую (остаётся для разбора)."""
+        self._set_status(task, "failed", error)
+
+    def pending(self) -> int:
+        """Ожидающие задачи переживают рестарт, дочитывать их не нужно."""
+        return 0
+
+    def _set_status(
+        self,
+        task: QueuedTask,
+        status: str,
+        error: str,
+        run_after: datetime | None = None,
+    ) -> None:
+        values: dict[str, Any] = {"status": status, "last_error": error, "locked_at": None}
+        if run_after is not None:
+            values["run_after"] = run_after
+        with self._session_factory() as db:
+            db.execute(
+                update(BackgroundTask).where(BackgroundTask.id == task.id).values(**values)
+            )
+            db.commit()
+
+
+class TaskQueue:
+    """Асинхронная очередь с ограниченной параллельностью, ретраями и drain.
+
+    Обработчики синхронные и выполняются в пуле потоков, поэтому могут
+    свободно открывать собственную сессию БД.
+    """
+
+    def __init__(
+        self,
+        backend: InMemoryTaskBackend | DatabaseTaskBackend,
+        session_factory: sessionmaker = SessionLocal,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        retry_delay: float = 1.0,
+        poll_interval: float = 1.0,
+    ) -> None:
+        self.backend = backend
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self._handlers: dict[str, TaskHandler] = {}
+        self._inflight: set[asyncio.Task] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._runner: asyncio.Task | None = None
+        self._stopping = False
+
+        event.listen(session_factory, "after_commit", self._after_commit)
+        event.listen(session_factory, "after_soft_rollback", self._after_rollback)
+
+    def task(self, name: str) -> Callable[[TaskHandler], TaskHandler]:
+        """Зарегистрировать обработчик задачи под именем `name`."""
+
+        def decorator(handler: TaskHandler) -> TaskHandler:
+            self._handlers[name] = handler
+            return handler
+
+        return decorator
+
+    def enqueue(self, db: Session, name: str, payload: dict[str, Any]) -> None:
+        """Поставить задачу; она будет запущена только после commit сессии `db`."""
+        if name not in self._handlers:
+            raise ValueError(f"Unknown task: {name}")
+        task = QueuedTask(name=name, payload=payload)
+        if not db.in_transaction():
+            # Без открытой транзакции rollback не вызывает событий и не сбросит задачу.
+            db.begin()
+        self.backend.stage(db, task)
+        db.info.setdefault(_PENDING_KEY, []).append(task)
+
+    async def start(self) -> None:
+        """Запустить цикл выдачи задач в текущем event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._runner = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Перестать брать новые задачи и дождаться текущих.
+
+        Очередь в памяти при этом дочитывается до конца (в пределах
+        `timeout`), иначе её задачи потерялись бы вместе с процессом.
+        """
+        if self._runner is None or self._loop is None:
+            return
+        self._stopping = True
+        self._wake()
+        await self._runner
+        self._runner = None
+
+        deadline = self._loop.time() + timeout
+        while (remaining := deadline - self._loop.time()) > 0:
+            if not self.backend.durable:
+                await self._dispatch_ready()
+            if not self._inflight:
+                if self.backend.durable or not self.backend.pending():
+                    break
+                await asyncio.sleep(min(self.poll_interval, remaining))
+                continue
+            await asyncio.wait(
+                set(self._inflight),
+                timeout=remaining,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+        if self._inflight or self.backend.pending():
+            logger.warning(
+                "Task queue stopped with %d running and %d pending tasks.",
+                len(self._inflight),
+                self.backend.pending(),
+            )
+        for future in self._inflight:
+            future.cancel()
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                await self._dispatch_ready()
+            except Exception:
+                logger.exception("Failed to claim background tasks.")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _dispatch_ready(self) -> None:
+        free = self.concurrency - len(self._inflight)
+        if free <= 0:
+            return
+        for task in await asyncio.to_thread(self.backend.claim, free):
+            future = asyncio.create_task(self._execute(task))
+            self._inflight.add(future)
+            future.add_done_callback(self._on_done)
+
+    def _on_done(self, future: asyncio.Task) -> None:
+        self._inflight.discard(future)
+        self._wake()
+
+    async def _execute(self, task: QueuedTask) -> None:
+        handler = self._handlers.get(task.name)
+        try:
+            if handler is None:
+                raise LookupError(f"Unknown task: {task.name}")
+            await asyncio.to_thread(handler, task.payload)
+        except Exception as exc:
+            error = repr(exc)
+            try:
+                if task.attempts >= self.max_attempts:
+                    logger.exception("Task %s failed after %d attempts.", task.name, task.attempts)
+                    await asyncio.to_thread(self.backend.fail, task, error)
+                else:
+                    delay = self.retry_delay * 2 ** (task.attempts - 1)
+                    run_after = datetime.utcnow() + timedelta(seconds=delay)
+                    await asyncio.to_thread(self.backend.retry, task, error, run_after)
+            except Exception:
+                logger.exception("Failed to reschedule task %s.", task.name)
+            return
+        try:
+            await asyncio.to_thread(self.backend.complete, task)
+        except Exception:
+            logger.exception("Failed to mark task %s as complete.", task.name)
+
+    def _after_commit(self, session: Session) -> None:
+        tasks = session.info.pop(_PENDING_KEY, None)
+        if not tasks:
+            return
+        for task in tasks:
+            self.backend.push(task)
+        self._wake()
+
+    def _after_rollback(self, session: Session, previous_transaction: Any) -> None:
+        session.info.pop(_PENDING_KEY, None)
+
+    def _wake(self) -> None:
+        if self._loop is None or self._wakeup is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+
+def _build_task_queue() -> TaskQueue:
+    """Создать очередь на основе переменных окружения TASK_QUEUE_*."""
+    backend_name = os.getenv("TASK_QUEUE_BACKEND", "memory").lower()
+    if backend_name == "database":
+        backend: InMemoryTaskBackend | DatabaseTaskBackend = DatabaseTaskBackend()
+    elif backend_name == "memory":
+        backend = InMemoryTaskBackend()
+    else:
+        raise RuntimeError(f"Unknown TASK_QUEUE_BACKEND: {backend_name}")
+    return TaskQueue(
+        backend,
+        concurrency=int(os.getenv("TASK_QUEUE_CONCURRENCY", "4")),
+        max_attempts=int(os.getenv("TASK_QUEUE_MAX_ATTEMPTS", "3")),
+    )
+
+
+task_queue = _build_task_queue()
+TASK_QUEUE_DRAIN_TIMEOUT = float(os.getenv("TASK_QUEUE_DRAIN_TIMEOUT", "10"))
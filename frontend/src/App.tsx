@@ -11,7 +11,7 @@ import type {
   Stage,
   StageId,
 } from "./types";
-import { stagesByLanguage } from "./data";
+import { createJobsSync, stagesByLanguage } from "./data";
 import { t } from "./i18n";
 import Header from "./components/Header";
 import Dashboard from "./components/Dashboard";
@@ -153,6 +153,7 @@ const App = () => {
   const [authUser, setAuthUser] = useState<ApiUser | null>(null);
   const [authRequired, setAuthRequired] = useState(false);
   const [loading, setLoading] = useState(true);
+  const jobsSyncRef = useRef(createJobsSync());
 
   const stageIdMap = useMemo(() => {
     const map: Record<StageId, number> = {
@@ -204,7 +205,7 @@ const App = () => {
         setAuthUser(me);
         const [stagesResult, jobsResult, metricsResult] = await Promise.all([
           api.getStages(),
-          api.getJobs(),
+          jobsSyncRef.current.refresh(),
           api.getMetrics(),
         ]);
         if (!active) {
@@ -236,6 +237,27 @@ const App = () => {
     };
   }, []);
 
+  useEffect(() => {
+    if (authRequired || !apiStages.length) {
+      return;
+    }
+    const handleFocus = async () => {
+      try {
+        const jobs = await jobsSyncRef.current.refresh();
+        setApplications(jobs.map((job) => toApplication(job, apiStages)));
+      } catch (err) {
+        if (err instanceof ApiError && err.status === 401) {
+          setAuthRequired(true);
+          setAuthUser(null);
+        }
+      }
+    };
+    window.addEventListener("focus", handleFocus);
+    return () => {
+      window.removeEventListener("focus", handleFocus);
+    };
+  }, [authRequired, apiStages]);
+
   const filtered = useMemo(() => {
     if (!query.trim()) {
       return applications;
@@ -585,6 +607,7 @@ const App = () => {
         }}
         onLogout={async () => {
           await api.logout();
+          jobsSyncRef.current.reset();
           setAuthUser(null);
           setAuthRequired(true);
           setApplications([]);
@@ -1,4 +1,5 @@
-﻿import type { Application, Stage, StageId } from "./types";
+﻿import type { ApiJob, Application, Stage, StageId } from "./types";
+import { api } from "./services/api";
 
 export const stageOrder: StageId[] = [
   "applied",
@@ -140,3 +141,57 @@ export const sampleApplications: Application[] = [
     source: "Referral",
   }
 ];
+
+export type JobsSync = {
+  refresh: () => Promise<ApiJob[]>;
+  reset: () => void;
+};
+
+// Local copy of the user's jobs: the first load is the columnar /jobs list with its cursor,
+// then /jobs/changes downloads only jobs changed after it, tombstones drop removed ones.
+export const createJobsSync = (): JobsSync => {
+  const jobs = new Map<number, ApiJob>();
+  let cursor = 0;
+
+  const snapshot = () =>
+    [...jobs.values()].sort((a, b) => b.updated_at.localeCompare(a.updated_at));
+
+  return {
+    refresh: async () => {
+      if (cursor === 0) {
+        const initial = await api.getJobs();
+        jobs.clear();
+        initial.jobs.forEach((job) => jobs.set(job.id, job));
+        cursor = initial.cursor;
+        return snapshot();
+      }
+      const changes = await api.getJobChanges(cursor);
+      // Jobs and tombstones are applied in change_version order; a tombstone only
+      // removes a copy older than itself, never a job written after it.
+      const events = [
+        ...changes.jobs.map((job) => ({
+          version: job.change_version,
+          apply: () => {
+            jobs.set(job.id, job);
+          },
+        })),
+        ...changes.tombstones.map((item) => ({
+          version: item.change_version,
+          apply: () => {
+            const current = jobs.get(item.job_id);
+            if (current && current.change_version < item.change_version) {
+              jobs.delete(item.job_id);
+            }
+          },
+        })),
+      ].sort((a, b) => a.version - b.version);
+      events.forEach((event) => event.apply());
+      cursor = changes.cursor;
+      return snapshot();
+    },
+    reset: () => {
+      jobs.clear();
+      cursor = 0;
+    },
+  };
+};
@@ -1,3 +1,5 @@
+import type { ApiJob, ApiJobsColumnar } from "../types";
+
 const API_URL = import.meta.env.VITE_API_URL ?? "http://localhost:8000";
 const DEV_USER_ID = import.meta.env.VITE_DEV_USER_ID;
 
@@ -38,11 +40,63 @@ async function request<T>(path: string, options: RequestInit = {}): Promise<T> {
   return response.json() as Promise<T>;
 }
 
+// Same shape as the JSON path: naive UTC ISO string, microseconds only when non-zero.
+const toIsoDate = (value: number | null) => {
+  if (value == null) {
+    return null;
+  }
+  const micros = ((value % 1_000_000) + 1_000_000) % 1_000_000;
+  const seconds = (value - micros) / 1_000_000;
+  const base = new Date(seconds * 1000).toISOString().slice(0, 19);
+  return micros ? `${base}.${String(micros).padStart(6, "0")}` : base;
+};
+
+const decodeColumnarJobs = (payload: ApiJobsColumnar): ApiJob[] => {
+  const { columns, dictionaries } = payload;
+  const decode = (name: string, index: number) =>
+    dictionaries[name][columns[name][index] as number];
+  return Array.from({ length: payload.count }, (_, index) => ({
+    id: columns.id[index] as number,
+    user_id: decode("user_id", index) as number,
+    stage_id: decode("stage_id", index) as number,
+    company: decode("company", index) as string,
+    position: columns.position[index] as string,
+    source: decode("source", index) as string | null,
+    salary: columns.salary[index] as string | null,
+    stack: columns.stack[index] as string | null,
+    notes: columns.notes[index] as string | null,
+    priority: decode("priority", index) as string | null,
+    applied_at: toIsoDate(columns.applied_at[index] as number | null),
+    hr_response_at: toIsoDate(columns.hr_response_at[index] as number | null),
+    screening_at: toIsoDate(columns.screening_at[index] as number | null),
+    tech_interview_at: toIsoDate(columns.tech_interview_at[index] as number | null),
+    homework_at: toIsoDate(columns.homework_at[index] as number | null),
+    final_at: toIsoDate(columns.final_at[index] as number | null),
+    offer_at: toIsoDate(columns.offer_at[index] as number | null),
+    rejected_at: toIsoDate(columns.rejected_at[index] as number | null),
+    created_at: toIsoDate(columns.created_at[index] as number) as string,
+    updated_at: toIsoDate(columns.updated_at[index] as number) as string,
+    change_version: columns.change_version[index] as number,
+  }));
+};
+
 export const api = {
   getMe: () => request<import("../types").ApiUser>("/me"),
   getStages: () => request<import("../types").ApiStage[]>("/stages"),
-  getJobs: () => request<import("../types").ApiJob[]>("/jobs"),
+  getJobs: async (options: { includeArchived?: boolean } = {}) => {
+    const params = new URLSearchParams({ format: "columnar" });
+    if (options.includeArchived) {
+      params.set("include_archived", "true");
+    }
+    const payload = await request<ApiJobsColumnar>(`/jobs?${params}`);
+    return { cursor: payload.cursor, jobs: decodeColumnarJobs(payload) };
+  },
+  getJobChanges: (since: number) =>
+    request<import("../types").ApiJobChanges>(`/jobs/changes?since=${since}`),
+  getFacets: () => request<import("../types").ApiJobFacets>("/jobs/facets"),
   getMetrics: () => request<import("../types").ApiMetrics>("/metrics"),
+  getCohorts: (bucket: "week" | "month" = "week") =>
+    request<import("../types").ApiCohorts>(`/metrics/cohorts?bucket=${bucket}`),
   createJob: (payload: Record<string, unknown>) =>
     request<import("../types").ApiJob>("/jobs", {
       method: "POST",
@@ -65,6 +65,27 @@ export type ApiJob = {
   rejected_at: string | null;
   created_at: string;
   updated_at: string;
+  change_version: number;
+};
+
+export type ApiJobTombstone = {
+  job_id: number;
+  reason: string;
+  change_version: number;
+};
+
+export type ApiJobChanges = {
+  cursor: number;
+  jobs: ApiJob[];
+  tombstones: ApiJobTombstone[];
+};
+
+export type ApiJobsColumnar = {
+  format: "columnar";
+  count: number;
+  cursor: number;
+  dictionaries: Record<string, (string | number | null)[]>;
+  columns: Record<string, (string | number | null)[]>;
 };
 
 export type ApiStageCount = {
@@ -87,3 +108,40 @@ export type ApiMetrics = {
   conversions: ApiConversion[];
   avg_hr_response_days: number | null;
 };
+
+export type ApiCohortStage = {
+  stage_id: number;
+  stage_name: string;
+  reached: number;
+  conversion_rate: number;
+  median_days: number | null;
+};
+
+export type ApiCohort = {
+  period_start: string;
+  size: number;
+  stages: ApiCohortStage[];
+};
+
+export type ApiCohorts = {
+  bucket: "week" | "month";
+  cohorts: ApiCohort[];
+};
+
+export type ApiFacetCount = {
+  value: string;
+  count: number;
+};
+
+export type ApiStageFacetCount = {
+  stage_id: number;
+  stage_name: string;
+  count: number;
+};
+
+export type ApiJobFacets = {
+  source: ApiFacetCount[];
+  priority: ApiFacetCount[];
+  stack: ApiFacetCount[];
+  stage: ApiStageFacetCount[];
+};
@@ -1,24 +1,52 @@
 """Входная точка FastAPI для API трекера воронки поиска работы."""
 
+import heapq
+import math
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Literal
 
+import numpy as np
 from authlib.integrations.starlette_client import OAuth
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, RedirectResponse
-from sqlalchemy import func, select
+from sqlalchemy import Float, cast, extract, func, select, union_all, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from starlette.middleware.sessions import SessionMiddleware
 
+from app.cache import VersionedCache
+from app.cohorts import CohortBucket, build_cohort_matrix
+from app.columnar import encode_jobs_columnar
+from app.compression import CompressionMiddleware
+from app.db import SessionLocal
 from app.deps import get_db
-from app.models import Job, Stage, User
+from app.facets import get_job_facets, stack_filter, sync_stack_tags
+from app.models import (
+    STAGE_DATE_MAP,
+    Job,
+    JobArchive,
+    JobArchiveSummary,
+    JobTombstone,
+    Stage,
+    User,
+    UserMetricsSnapshot,
+)
+from app.ratelimit import rate_limiter
 from app.schemas import (
+    Cohort,
+    CohortStage,
+    CohortsOut,
     ConversionMetric,
+    JobChangesOut,
     JobCreate,
+    JobFacetsOut,
     JobOut,
+    JobsColumnarOut,
+    JobTombstoneOut,
     JobUpdate,
     MetricsOut,
     StageProgress,
@@ -27,17 +55,7 @@ from app.schemas import (
     UserCreate,
     UserOut,
 )
-
-STAGE_DATE_MAP = {
-    "Applied": "applied_at",
-    "HR Response": "hr_response_at",
-    "Screening": "screening_at",
-    "Tech Interview": "tech_interview_at",
-    "Homework": "homework_at",
-    "Final": "final_at",
-    "Offer": "offer_at",
-    "Rejected": "rejected_at",
-}
+from app.tasks import TASK_QUEUE_DRAIN_TIMEOUT, task_queue
 
 load_dotenv()
 FRONTEND_ORIGIN = os.getenv("FRONTEND_ORIGIN", "http://localhost:5173")
@@ -45,8 +63,21 @@ SESSION_SECRET = os.getenv("SESSION_SECRET", "change-me")
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 ALLOW_DEV_HEADER = os.getenv("ALLOW_DEV_HEADER", "false").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+metrics_cache = VersionedCache()
+cohorts_cache = VersionedCache()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Запустить фоновую очередь и дождаться её задач при остановке."""
+    await task_queue.start()
+    yield
+    await task_queue.stop(timeout=TASK_QUEUE_DRAIN_TIMEOUT)
 
-app = FastAPI(title="Job Search Funnel Tracker")
+
+app = FastAPI(title="Job Search Funnel Tracker", lifespan=lifespan)
 
 app.add_middleware(
     SessionMiddleware,
@@ -55,6 +86,8 @@ app.add_middleware(
     https_only=False,
 )
 
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[FRONTEND_ORIGIN],
@@ -100,6 +133,42 @@ def _get_current_user(
     raise HTTPException(status_code=401, detail="Not authenticated.")
 
 
+def _claimed_user_id(request: Request, x_user_id: int | None) -> int | None:
+    """Id пользователя из сессии (или dev-хедера) без обращения к БД."""
+    user_id = request.session.get("user_id")
+    if user_id:
+        return int(user_id)
+    if ALLOW_DEV_HEADER and x_user_id is not None:
+        return x_user_id
+    return None
+
+
+def _rate_limited(budget: str):
+    """Зависимость: списать запрос пользователя из бюджета `budget`.
+
+    `expensive` — тяжелые агрегаты (метрики, фасеты), `cheap` — остальное.
+    Подключается через `dependencies=` маршрута и поэтому выполняется до
+    `get_db`: пользователь берется из сессии без запроса к БД, и
+    ограниченный запрос получает 429, не занимая соединение из пула.
+    Запросы без пользователя не ограничиваются — их отклонит
+    `_get_current_user` с 401.
+    """
+
+    def dependency(request: Request, x_user_id: int | None = Header(default=None)) -> None:
+        user_id = _claimed_user_id(request, x_user_id)
+        if user_id is None:
+            return
+        retry_after = rate_limiter.check(budget, user_id)
+        if retry_after:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests.",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    return dependency
+
+
 def _apply_stage_timestamp(job: Job, stage_name: str, explicit_updates: JobUpdate) -> None:
     """Записать время этапа, если оно не передано явно."""
     date_field = STAGE_DATE_MAP.get(stage_name)
@@ -111,6 +180,50 @@ def _apply_stage_timestamp(job: Job, stage_name: str, explicit_updates: JobUpdat
         setattr(job, date_field, datetime.utcnow())
 
 
+def _mark_user_data_changed(db: Session, user: User, job: Job) -> None:
+    """Увеличить версию данных пользователя и поставить пересчет производных данных.
+
+    Новая версия записывается в `job.change_version` и служит курсором
+    `/jobs/changes`. Строка пользователя остается заблокированной до commit,
+    поэтому версии одного пользователя фиксируются по порядку.
+    Вызывается до commit: задачи стартуют только если запись прошла.
+    """
+    version = db.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values(data_version=User.data_version + 1)
+        .returning(User.data_version)
+    ).scalar_one()
+    job.change_version = version
+    task_queue.enqueue(db, "warm_metrics", {"user_id": user.id, "data_version": version})
+
+
+@task_queue.task("warm_metrics")
+def _warm_metrics_task(payload: dict) -> None:
+    """Посчитать метрики для актуальной версии данных и сохранить снимок.
+
+    Снимок в `user_metrics_snapshots` читают все воркеры, поэтому задачу
+    может выполнить любой из них (в том числе через бэкенд `database`).
+    Если после постановки задачи были новые записи, задача устарела: ее
+    версию все равно инвалидирует следующая, а посчитает задача этой записи.
+    """
+    with SessionLocal() as db:
+        user = db.get(User, payload["user_id"])
+        if user is None or user.data_version != payload["data_version"]:
+            return
+        metrics = _get_cached_metrics(db, user)
+        snapshot = db.get(UserMetricsSnapshot, user.id, with_for_update=True)
+        if snapshot is None:
+            snapshot = UserMetricsSnapshot(user_id=user.id)
+            db.add(snapshot)
+        elif snapshot.data_version >= payload["data_version"]:
+            return
+        snapshot.data_version = payload["data_version"]
+        snapshot.metrics = metrics.model_dump(mode="json")
+        snapshot.computed_at = datetime.utcnow()
+        db.commit()
+
+
 @app.get("/stages", response_model=list[StageOut])
 def list_stages(db: Annotated[Session, Depends(get_db)]):
     """Вернуть список всех этапов."""
@@ -194,7 +307,11 @@ def logout(request: Request):
     return JSONResponse({"ok": True})
 
 
-@app.get("/me", response_model=UserOut)
+@app.get(
+    "/me",
+    response_model=UserOut,
+    dependencies=[Depends(_rate_limited("cheap"))],
+)
 def get_me(
     db: Annotated[Session, Depends(get_db)],
     user: Annotated[User, Depends(_get_current_user)],
@@ -203,20 +320,131 @@ def get_me(
     return user
 
 
-@app.get("/jobs", response_model=list[JobOut])
+def _filter_jobs(
+    query,
+    model: type[Job] | type[JobArchive],
+    user_id: int,
+    stage_id: list[int] | None,
+    source: list[str] | None,
+    priority: list[str] | None,
+    stack: list[str] | None,
+):
+    """Применить фильтры списка: OR внутри поля, AND между полями."""
+    query = query.where(model.user_id == user_id)
+    if stage_id:
+        query = query.where(model.stage_id.in_(stage_id))
+    if source:
+        query = query.where(model.source.in_(source))
+    if priority:
+        query = query.where(model.priority.in_(priority))
+    if stack:
+        query = query.where(model.id.in_(stack_filter(user_id, stack)))
+    return query
+
+
+@app.get(
+    "/jobs",
+    response_model=list[JobOut] | JobsColumnarOut,
+    dependencies=[Depends(_rate_limited("cheap"))],
+)
 def list_jobs(
     db: Annotated[Session, Depends(get_db)],
     user: Annotated[User, Depends(_get_current_user)],
-    stage_id: int | None = None,
+    stage_id: Annotated[list[int] | None, Query()] = None,
+    source: Annotated[list[str] | None, Query()] = None,
+    priority: Annotated[list[str] | None, Query()] = None,
+    stack: Annotated[list[str] | None, Query()] = None,
+    include_archived: bool = False,
+    response_format: Annotated[Literal["json", "columnar"], Query(alias="format")] = "json",
 ):
-    """Вернуть заявки текущего пользователя с фильтром по этапу."""
-    query = select(Job).where(Job.user_id == user.id).order_by(Job.updated_at.desc())
-    if stage_id is not None:
-        query = query.where(Job.stage_id == stage_id)
-    return db.execute(query).scalars().all()
+    """Вернуть заявки текущего пользователя с фильтрами.
+
+    Фильтры принимают несколько значений (`?source=A&source=B`), `stack`
+    сравнивается по нормализованным тегам. По умолчанию читается только
+    горячая таблица; `include_archived=true` добавляет заявки из `jobs_archive`.
+    `format=columnar` возвращает колоночный формат (см. `app/columnar.py`)
+    вместе с курсором `/jobs/changes`: полный список без фильтров служит
+    начальной загрузкой доски, дальше приходят только дельты.
+    """
+    cursor = user.data_version
+    filters = (user.id, stage_id, source, priority, stack)
+    query = _filter_jobs(select(Job), Job, *filters).order_by(Job.updated_at.desc())
+    jobs = db.execute(query).scalars().all()
+    if include_archived:
+        archive_query = _filter_jobs(select(JobArchive), JobArchive, *filters).order_by(
+            JobArchive.updated_at.desc()
+        )
+        archived = db.execute(archive_query).scalars().all()
+        jobs = list(heapq.merge(jobs, archived, key=lambda job: job.updated_at, reverse=True))
+    if response_format == "columnar":
+        return JSONResponse({**encode_jobs_columnar(jobs), "cursor": cursor})
+    return jobs
 
 
-@app.post("/jobs", response_model=JobOut, status_code=201)
+@app.get(
+    "/jobs/changes",
+    response_model=JobChangesOut,
+    dependencies=[Depends(_rate_limited("cheap"))],
+)
+def list_job_changes(
+    db: Annotated[Session, Depends(get_db)],
+    user: Annotated[User, Depends(_get_current_user)],
+    since: int = 0,
+):
+    """Вернуть заявки, созданные или измененные после курсора `since`.
+
+    Курсор — `User.data_version`; `since=0` отдает всю горячую таблицу.
+    Заявки, ушедшие из нее (архив, удаление), приходят как tombstones.
+    Курсор читается до выборки, поэтому изменения не теряются, а
+    параллельная запись в худшем случае придет повторно.
+    """
+    cursor = user.data_version
+    jobs = (
+        db.execute(
+            select(Job)
+            .where(Job.user_id == user.id, Job.change_version > since)
+            .order_by(Job.change_version.asc())
+        )
+        .scalars()
+        .all()
+    )
+    tombstones = []
+    if since:
+        tombstones = (
+            db.execute(
+                select(JobTombstone)
+                .where(JobTombstone.user_id == user.id, JobTombstone.change_version > since)
+                .order_by(JobTombstone.change_version.asc())
+            )
+            .scalars()
+            .all()
+        )
+    return JobChangesOut(
+        cursor=cursor,
+        jobs=[JobOut.model_validate(job) for job in jobs],
+        tombstones=[JobTombstoneOut.model_validate(item) for item in tombstones],
+    )
+
+
+@app.get(
+    "/jobs/facets",
+    response_model=JobFacetsOut,
+    dependencies=[Depends(_rate_limited("expensive"))],
+)
+def list_job_facets(
+    db: Annotated[Session, Depends(get_db)],
+    user: Annotated[User, Depends(_get_current_user)],
+):
+    """Вернуть счетчики по источнику, приоритету, тегам стека и этапу."""
+    return get_job_facets(db, user.id)
+
+
+@app.post(
+    "/jobs",
+    response_model=JobOut,
+    status_code=201,
+    dependencies=[Depends(_rate_limited("cheap"))],
+)
 def create_job(
     payload: JobCreate,
     db: Annotated[Session, Depends(get_db)],
@@ -242,21 +470,36 @@ def create_job(
     _apply_stage_timestamp(job, stage.name, JobUpdate())
 
     db.add(job)
+    db.flush()
+    sync_stack_tags(db, job)
+    _mark_user_data_changed(db, user, job)
     db.commit()
     db.refresh(job)
     return job
 
 
-@app.patch("/jobs/{job_id}", response_model=JobOut)
+@app.patch(
+    "/jobs/{job_id}",
+    response_model=JobOut,
+    dependencies=[Depends(_rate_limited("cheap"))],
+)
 def update_job(
     job_id: int,
     payload: JobUpdate,
     db: Annotated[Session, Depends(get_db)],
     user: Annotated[User, Depends(_get_current_user)],
 ):
-    """Обновить заявку текущего пользователя."""
-    job = db.get(Job, job_id)
+    """Обновить заявку текущего пользователя (архивные заявки только для чтения).
+
+    Строка заявки блокируется до увеличения версии пользователя: архиватор
+    берет блокировки в том же порядке (jobs, затем users), и взаимной
+    блокировки нет, а заявку, которую он уже перенес, мы просто не найдем.
+    """
+    job = db.get(Job, job_id, with_for_update=True)
     if not job:
+        archived = db.get(JobArchive, job_id)
+        if archived and archived.user_id == user.id:
+            raise HTTPException(status_code=409, detail="Job is archived.")
         raise HTTPException(status_code=404, detail="Job not found.")
     if job.user_id != user.id:
         raise HTTPException(status_code=403, detail="Forbidden.")
@@ -268,26 +511,146 @@ def update_job(
         job.stage_id = stage.id
         _apply_stage_timestamp(job, stage.name, payload)
 
-    for field, value in payload.model_dump(exclude={"stage_id"}, exclude_unset=True).items():
+    updates = payload.model_dump(exclude={"stage_id"}, exclude_unset=True)
+    for field, value in updates.items():
         setattr(job, field, value)
+    if "stack" in updates:
+        sync_stack_tags(db, job)
 
-    db.commit()
+    _mark_user_data_changed(db, user, job)
+    try:
+        db.commit()
+    except StaleDataError:
+        # SQLite не поддерживает FOR UPDATE: заявку могли архивировать после чтения.
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Job is archived.")
     db.refresh(job)
     return job
 
 
-@app.get("/metrics", response_model=MetricsOut)
+@app.get(
+    "/metrics",
+    response_model=MetricsOut,
+    dependencies=[Depends(_rate_limited("expensive"))],
+)
 def get_metrics(
     db: Annotated[Session, Depends(get_db)],
     user: Annotated[User, Depends(_get_current_user)],
 ):
     """Вернуть метрики воронки для текущего пользователя."""
+    return _get_cached_metrics(db, user)
+
+
+@app.get(
+    "/metrics/cohorts",
+    response_model=CohortsOut,
+    dependencies=[Depends(_rate_limited("expensive"))],
+)
+def get_cohort_metrics(
+    db: Annotated[Session, Depends(get_db)],
+    user: Annotated[User, Depends(_get_current_user)],
+    bucket: CohortBucket = "week",
+):
+    """Вернуть конверсию по когортам `applied_at` (неделя или месяц)."""
+    version = user.data_version
+    cached = cohorts_cache.get((user.id, bucket), version)
+    if cached is not None:
+        return cached
+    cohorts = _compute_cohorts(db, user.id, bucket)
+    cohorts_cache.set((user.id, bucket), version, cohorts)
+    return cohorts
+
+
+def _compute_cohorts(db: Session, user_id: int, bucket: CohortBucket) -> CohortsOut:
+    """Посчитать матрицу когорт по одной колоночной выборке горячих и архивных заявок."""
+    stages = [
+        stage
+        for stage in db.execute(select(Stage).order_by(Stage.order_index.asc())).scalars()
+        if stage.name in STAGE_DATE_MAP
+    ]
+    date_fields = [STAGE_DATE_MAP[stage.name] for stage in stages]
+
+    fields = ["applied_at", *date_fields]
+    # Время приходит из БД уже секундами epoch: без datetime-объектов на строку,
+    # а NULL при сборке float-матрицы становится NaN.
+    rows = db.execute(
+        union_all(
+            *(
+                select(
+                    *(cast(extract("epoch", getattr(model, field)), Float) for field in fields)
+                ).where(
+                    model.user_id == user_id,
+                    model.applied_at.is_not(None),
+                )
+                for model in (Job, JobArchive)
+            )
+        )
+    ).all()
+    values = np.array(rows, dtype=np.float64).reshape(len(rows), len(fields))
+    matrix = build_cohort_matrix(
+        values[:, 0],
+        {field: values[:, index] for index, field in enumerate(date_fields, start=1)},
+        bucket,
+    )
+
+    sizes = matrix.sizes.tolist()
+    reached = {field: matrix.reached[field].tolist() for field in date_fields}
+    medians = {
+        field: [None if math.isnan(value) else value for value in matrix.median_days[field].tolist()]
+        for field in date_fields
+    }
+    cohorts = [
+        Cohort(
+            period_start=period_start,
+            size=size,
+            stages=[
+                CohortStage(
+                    stage_id=stage.id,
+                    stage_name=stage.name,
+                    reached=reached[field][index],
+                    conversion_rate=reached[field][index] / size,
+                    median_days=medians[field][index],
+                )
+                for stage, field in zip(stages, date_fields)
+            ],
+        )
+        for index, (period_start, size) in enumerate(
+            zip(matrix.period_starts.tolist(), sizes)
+        )
+    ]
+    return CohortsOut(bucket=bucket, cohorts=cohorts)
+
+
+def _get_cached_metrics(db: Session, user: User) -> MetricsOut:
+    """Вернуть метрики текущей версии данных: кэш процесса, снимок в БД или расчет."""
+    version = user.data_version
+    cached = metrics_cache.get(user.id, version)
+    if cached is not None:
+        return cached
+    snapshot = db.get(UserMetricsSnapshot, user.id)
+    if snapshot is not None and snapshot.data_version == version:
+        metrics = MetricsOut.model_validate(snapshot.metrics)
+    else:
+        metrics = _compute_metrics(db, user.id)
+    metrics_cache.set(user.id, version, metrics)
+    return metrics
+
+
+def _compute_metrics(db: Session, user_id: int) -> MetricsOut:
+    """Посчитать метрики воронки пользователя.
+
+    Горячая таблица агрегируется запросами, архив — из `jobs_archive_summary`.
+    """
+    summary = db.get(JobArchiveSummary, user_id)
+    archived_stage_counts = summary.stage_counts if summary else {}
+    archived_progress = summary.progress_counts if summary else {}
+
     stage_rows = (
         db.execute(
             select(Stage.id, Stage.name, func.count(Job.id))
             .join(
                 Job,
-                (Job.stage_id == Stage.id) & (Job.user_id == user.id),
+                (Job.stage_id == Stage.id) & (Job.user_id == user_id),
                 isouter=True,
             )
             .group_by(Stage.id, Stage.name)
@@ -297,7 +660,11 @@ def get_metrics(
     )
 
     stage_counts = [
-        StageCount(stage_id=stage_id, stage_name=name, count=count)
+        StageCount(
+            stage_id=stage_id,
+            stage_name=name,
+            count=count + archived_stage_counts.get(str(stage_id), 0),
+        )
         for stage_id, name, count in stage_rows
     ]
     count_by_stage_id = {item.stage_id: item.count for item in stage_counts}
@@ -315,11 +682,11 @@ def get_metrics(
         column = getattr(Job, date_field)
         count = db.execute(
             select(func.count(Job.id)).where(
-                Job.user_id == user.id,
+                Job.user_id == user_id,
                 column.is_not(None),
             )
         ).scalar_one()
-        timestamp_counts[stage.name] = count
+        timestamp_counts[stage.name] = count + archived_progress.get(date_field, 0)
 
     stage_progress = [
         StageProgress(
@@ -351,17 +718,18 @@ def get_metrics(
 
     response_rows = db.execute(
         select(Job.applied_at, Job.hr_response_at).where(
-            Job.user_id == user.id,
+            Job.user_id == user_id,
             Job.applied_at.is_not(None),
             Job.hr_response_at.is_not(None),
         )
     ).all()
+    total_days = summary.hr_response_days_total if summary else 0.0
+    response_count = len(response_rows) + (summary.hr_response_count if summary else 0)
+    for applied_at, hr_response_at in response_rows:
+        total_days += (hr_response_at - applied_at).total_seconds() / 86400
     avg_days = None
-    if response_rows:
-        total_days = 0.0
-        for applied_at, hr_response_at in response_rows:
-            total_days += (hr_response_at - applied_at).total_seconds() / 86400
-        avg_days = total_days / len(response_rows)
+    if response_count:
+        avg_days = total_days / response_count
 
     return MetricsOut(
         stage_counts=stage_counts,
@@ -0,0 +1,42 @@
+"""Перенести старые заявки в терминальных этапах в `jobs_archive`.
+
+Работает пачками, каждая пачка — отдельная транзакция, поэтому прерванный
+запуск можно безопасно повторить.
+
+    python scripts/archive_jobs.py --older-than-days 90 --batch-size 500
+"""
+
+import argparse
+import os
+import sys
+from datetime import timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.archive import archive_terminal_jobs  # noqa: E402
+from app.db import SessionLocal  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=int(os.getenv("ARCHIVE_AFTER_DAYS", "90")),
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        moved = archive_terminal_jobs(
+            db,
+            older_than=timedelta(days=args.older_than_days),
+            batch_size=args.batch_size,
+            max_batches=args.max_batches,
+        )
+    print(f"Archived {moved} jobs.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Общие настройки тестов: отдельная SQLite-база вместо DATABASE_URL."""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+_DB_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+os.environ["ALLOW_DEV_HEADER"] = "true"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+@pytest.fixture
+def client():
+    """Клиент приложения над пустой схемой с одним этапом и пользователем id=1."""
+    from fastapi.testclient import TestClient
+
+    import main
+    from app.db import Base, SessionLocal, engine
+    from app.models import Stage, User
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add(Stage(name="Applied", order_index=1, is_terminal=False))
+        db.add(User(email="user@example.com"))
+        db.commit()
+    with TestClient(main.app) as test_client:
+        yield test_client
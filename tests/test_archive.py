@@ -0,0 +1,117 @@
+"""Тесты архивации: перенос заявок в `jobs_archive` и чтение после него."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import main
+from app.archive import archive_terminal_jobs
+from app.db import SessionLocal
+from app.models import Job, JobArchive, JobArchiveSummary, Stage
+
+HEADERS = {"X-User-Id": "1"}
+
+
+@pytest.fixture
+def rejected_stage_id(client):
+    with SessionLocal() as db:
+        stage = Stage(name="Rejected", order_index=8, is_terminal=True)
+        db.add(stage)
+        db.commit()
+        return stage.id
+
+
+def _create_job(client, **fields):
+    response = client.post("/jobs", json={"position": "Dev", **fields}, headers=HEADERS)
+    assert response.status_code == 201
+    return response.json()
+
+
+def _archive(job_ids, stage_id, **options):
+    with SessionLocal() as db:
+        db.query(Job).filter(Job.id.in_(job_ids)).update(
+            {"stage_id": stage_id, "updated_at": datetime.utcnow() - timedelta(days=200)},
+            synchronize_session=False,
+        )
+        db.commit()
+        return archive_terminal_jobs(db, timedelta(days=90), **options)
+
+
+def test_archiving_keeps_metrics_and_list(client, rejected_stage_id):
+    with SessionLocal() as db:
+        db.add(Stage(name="HR Response", order_index=2, is_terminal=False))
+        db.commit()
+    jobs = [
+        _create_job(
+            client,
+            company=company,
+            applied_at="2026-01-05T10:00:00",
+            hr_response_at=f"2026-01-{day:02d}T10:00:00",
+        )
+        for company, day in [("Alpha", 6), ("Beta", 8), ("Gamma", 9)]
+    ]
+    for job in jobs:
+        patch = {"stage_id": rejected_stage_id}
+        assert client.patch(f"/jobs/{job['id']}", json=patch, headers=HEADERS).status_code == 200
+    metrics_before = client.get("/metrics", headers=HEADERS).json()
+    assert metrics_before["avg_hr_response_days"] == pytest.approx(8 / 3)
+
+    assert _archive([job["id"] for job in jobs[1:]], rejected_stage_id, batch_size=1) == 2
+
+    assert client.get("/metrics", headers=HEADERS).json() == metrics_before
+    assert [job["id"] for job in client.get("/jobs", headers=HEADERS).json()] == [jobs[0]["id"]]
+    merged = client.get("/jobs", params={"include_archived": True}, headers=HEADERS).json()
+    assert sorted(job["id"] for job in merged) == [job["id"] for job in jobs]
+    updated = [job["updated_at"] for job in merged]
+    assert updated == sorted(updated, reverse=True)
+
+
+def test_interrupted_archiving_can_be_resumed(client, rejected_stage_id):
+    job_ids = [_create_job(client, company=f"Company {index}")["id"] for index in range(3)]
+
+    assert _archive(job_ids, rejected_stage_id, batch_size=2, max_batches=1) == 2
+    with SessionLocal() as db:
+        assert db.query(Job).count() == 1
+        assert db.query(JobArchive).count() == 2
+        assert db.get(JobArchiveSummary, 1).job_count == 2
+
+    assert _archive([], rejected_stage_id, batch_size=2) == 1
+    assert _archive([], rejected_stage_id, batch_size=2) == 0
+    with SessionLocal() as db:
+        assert db.query(JobArchive).count() == 3
+        assert db.get(JobArchiveSummary, 1).job_count == 3
+
+
+def test_archived_job_id_is_not_reused(client, rejected_stage_id):
+    _create_job(client, company="Alpha")
+    archived = _create_job(client, company="Beta", stack="Python")
+    cursor = client.get("/jobs/changes", headers=HEADERS).json()["cursor"]
+    assert _archive([archived["id"]], rejected_stage_id) == 1
+
+    created = _create_job(client, company="Gamma", stack="Go")
+
+    assert created["id"] != archived["id"]
+    listed = client.get("/jobs", params={"include_archived": True}, headers=HEADERS).json()
+    assert sorted(job["id"] for job in listed) == sorted({job["id"] for job in listed})
+    python_jobs = client.get(
+        "/jobs", params={"include_archived": True, "stack": "python"}, headers=HEADERS
+    ).json()
+    assert [job["id"] for job in python_jobs] == [archived["id"]]
+    changes = client.get("/jobs/changes", params={"since": cursor}, headers=HEADERS).json()
+    assert [job["id"] for job in changes["jobs"]] == [created["id"]]
+    assert [item["job_id"] for item in changes["tombstones"]] == [archived["id"]]
+
+
+def test_update_of_job_archived_mid_request_returns_409(client, rejected_stage_id, monkeypatch):
+    job = _create_job(client, company="Alpha")
+    mark_user_data_changed = main._mark_user_data_changed
+
+    def archive_then_mark(db, user, changed_job):
+        _archive([changed_job.id], rejected_stage_id)
+        mark_user_data_changed(db, user, changed_job)
+
+    monkeypatch.setattr(main, "_mark_user_data_changed", archive_then_mark)
+
+    response = client.patch(f"/jobs/{job['id']}", json={"notes": "x"}, headers=HEADERS)
+
+    assert response.status_code == 409
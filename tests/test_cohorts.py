@@ -0,0 +1,99 @@
+"""Тесты матрицы когорт: группировка по периодам, медианы и выборка из SQL."""
+
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pytest
+
+from app.cohorts import build_cohort_matrix
+from app.db import SessionLocal
+from app.models import Stage
+
+HEADERS = {"X-User-Id": "1"}
+DAY = 86400.0
+
+
+def _epoch(value: str) -> float:
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _column(*values: str | None) -> np.ndarray:
+    return np.array([np.nan if value is None else _epoch(value) for value in values])
+
+
+def test_week_buckets_start_on_monday():
+    # 2026-01-04 — воскресенье, 2026-01-05 и 2026-01-11 — понедельник и воскресенье одной недели.
+    applied = _column(
+        "2026-01-04T23:00", "2026-01-05T00:00", "2026-01-11T12:00", "2026-01-12T00:00"
+    )
+
+    matrix = build_cohort_matrix(applied, {}, "week")
+
+    assert matrix.period_starts.tolist() == [
+        date(2025, 12, 29),
+        date(2026, 1, 5),
+        date(2026, 1, 12),
+    ]
+    assert matrix.sizes.tolist() == [1, 2, 1]
+
+
+def test_month_buckets_and_rows_without_applied():
+    applied = _column("2026-01-31T23:59", "2026-02-01T00:00", None)
+
+    hr_response = _column(None, None, "2026-02-02")
+
+    matrix = build_cohort_matrix(applied, {"hr_response_at": hr_response}, "month")
+
+    assert matrix.period_starts.tolist() == [date(2026, 1, 1), date(2026, 2, 1)]
+    assert matrix.sizes.tolist() == [1, 1]
+    assert matrix.reached["hr_response_at"].tolist() == [0, 0]
+
+
+def test_median_skips_missing_stages_and_averages_even_counts():
+    applied = _column(*["2026-01-05"] * 5, "2026-01-12")
+    hr_response = applied + np.array([4, 1, np.nan, 3, 2, np.nan]) * DAY
+
+    matrix = build_cohort_matrix(applied, {"hr_response_at": hr_response}, "week")
+
+    assert matrix.reached["hr_response_at"].tolist() == [4, 0]
+    median = matrix.median_days["hr_response_at"]
+    assert median[0] == pytest.approx(2.5)
+    assert np.isnan(median[1])
+
+
+def test_empty_input():
+    matrix = build_cohort_matrix(np.array([]), {"hr_response_at": np.array([])}, "week")
+
+    assert matrix.period_starts.size == 0
+    assert matrix.sizes.tolist() == []
+    assert matrix.median_days["hr_response_at"].tolist() == []
+
+
+def test_cohorts_endpoint_reads_epoch_columns(client):
+    with SessionLocal() as db:
+        db.add(Stage(name="HR Response", order_index=2, is_terminal=False))
+        db.commit()
+    assert client.get("/metrics/cohorts", headers=HEADERS).json()["cohorts"] == []
+    for applied_at, hr_response_at in [
+        ("2026-01-05T10:00:00", "2026-01-07T10:00:00"),
+        ("2026-01-08T10:00:00", "2026-01-09T10:00:00"),
+        ("2026-01-11T10:00:00", None),
+    ]:
+        client.post(
+            "/jobs",
+            json={
+                "company": "Alpha",
+                "position": "Dev",
+                "applied_at": applied_at,
+                "hr_response_at": hr_response_at,
+            },
+            headers=HEADERS,
+        )
+
+    [cohort] = client.get("/metrics/cohorts", headers=HEADERS).json()["cohorts"]
+
+    assert cohort["period_start"] == "2026-01-05"
+    assert cohort["size"] == 3
+    [hr_response] = [stage for stage in cohort["stages"] if stage["stage_name"] == "HR Response"]
+    assert hr_response["reached"] == 2
+    assert hr_response["median_days"] == pytest.approx(1.5)
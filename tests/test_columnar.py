@@ -0,0 +1,38 @@
+"""Тесты колоночного формата: после декодирования совпадает с JSON-списком."""
+
+from datetime import datetime, timedelta
+
+from app.columnar import DICTIONARY_COLUMNS, TIMESTAMP_COLUMNS
+
+HEADERS = {"X-User-Id": "1"}
+
+
+def _decode(payload: dict) -> list[dict]:
+    columns = payload["columns"]
+    jobs = []
+    for index in range(payload["count"]):
+        job = {}
+        for name, values in columns.items():
+            value = values[index]
+            if name in DICTIONARY_COLUMNS:
+                value = payload["dictionaries"][name][value]
+            elif name in TIMESTAMP_COLUMNS and value is not None:
+                value = (datetime(1970, 1, 1) + timedelta(microseconds=value)).isoformat()
+            job[name] = value
+        jobs.append(job)
+    return jobs
+
+
+def test_columnar_list_round_trips_to_json(client):
+    jobs = [
+        {"company": "Alpha", "source": "LinkedIn", "applied_at": "2026-01-05T10:00:00.123456"},
+        {"company": "Alpha", "source": None, "priority": "high", "notes": "call back"},
+        {"company": "Beta", "source": "LinkedIn", "hr_response_at": "1969-12-31T23:59:59.5"},
+    ]
+    for job in jobs:
+        client.post("/jobs", json={"position": "Dev", **job}, headers=HEADERS)
+
+    payload = client.get("/jobs", params={"format": "columnar"}, headers=HEADERS).json()
+
+    assert sorted(payload["dictionaries"]["company"]) == ["Alpha", "Beta"]
+    assert _decode(payload) == client.get("/jobs", headers=HEADERS).json()
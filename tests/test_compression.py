@@ -0,0 +1,63 @@
+"""Тесты сжатия ответов: выбор кодека по Accept-Encoding и порог размера."""
+
+import gzip
+
+import brotli
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.compression import CompressionMiddleware, choose_encoding
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("gzip;q=0.8, br;q=0.9", "br"),
+        ("br;q=0, gzip;q=0", None),
+        ("*;q=0.3", "br"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_choose_encoding_respects_q_values(accept_encoding, expected):
+    assert choose_encoding(accept_encoding) == expected
+
+
+@pytest.fixture
+def compressed_client():
+    async def text(request):
+        return PlainTextResponse("x" * int(request.query_params["size"]))
+
+    app = Starlette(routes=[Route("/text", text)])
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "decompress"),
+    [("br", brotli.decompress), ("gzip", gzip.decompress)],
+)
+def test_bodies_above_threshold_are_compressed(compressed_client, accept_encoding, decompress):
+    with compressed_client.stream(
+        "GET", "/text", params={"size": 500}, headers={"Accept-Encoding": accept_encoding}
+    ) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == accept_encoding
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) == len(raw)
+    assert decompress(raw) == b"x" * 500
+
+
+def test_bodies_below_threshold_are_sent_as_is(compressed_client):
+    response = compressed_client.get(
+        "/text", params={"size": 99}, headers={"Accept-Encoding": "br, gzip"}
+    )
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "x" * 99
@@ -0,0 +1,29 @@
+"""Тесты фасетов: каждое значение можно передать обратно как фильтр `GET /jobs`."""
+
+HEADERS = {"X-User-Id": "1"}
+
+
+def test_facet_values_round_trip_as_filters(client):
+    jobs = [
+        {"company": "Alpha", "source": "LinkedIn", "priority": "high", "stack": "Python, Go"},
+        {"company": "Beta", "source": "Referral", "stack": "python"},
+        {"company": "Gamma"},
+    ]
+    for job in jobs:
+        client.post("/jobs", json={"position": "Dev", **job}, headers=HEADERS)
+
+    facets = client.get("/jobs/facets", headers=HEADERS).json()
+
+    assert [item["value"] for item in facets["source"]] == ["LinkedIn", "Referral"]
+    assert facets["priority"] == [{"value": "high", "count": 1}]
+    assert facets["stack"][0] == {"value": "python", "count": 2}
+    [stage] = facets["stage"]
+    assert stage["stage_name"] == "Applied" and stage["count"] == 3
+    checks = [("stage_id", stage["stage_id"], stage["count"])] + [
+        (name, item["value"], item["count"])
+        for name in ("source", "priority", "stack")
+        for item in facets[name]
+    ]
+    for name, value, count in checks:
+        listed = client.get("/jobs", params={name: value}, headers=HEADERS).json()
+        assert len(listed) == count, (name, value)
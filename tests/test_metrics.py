@@ -0,0 +1,39 @@
+"""Тесты метрик: снимок фоновой задачи доступен всем воркерам."""
+
+import time
+
+import main
+from app.cache import VersionedCache
+from app.db import SessionLocal
+from app.models import UserMetricsSnapshot
+
+HEADERS = {"X-User-Id": "1"}
+
+
+def _wait_for_snapshot(version: int, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        with SessionLocal() as db:
+            snapshot = db.get(UserMetricsSnapshot, 1)
+            if snapshot is not None and snapshot.data_version == version:
+                return
+        assert time.monotonic() < deadline, "warm_metrics did not store a snapshot"
+        time.sleep(0.01)
+
+
+def test_metrics_snapshot_is_served_without_recomputing(client, monkeypatch):
+    job = client.post("/jobs", json={"company": "Alpha", "position": "Dev"}, headers=HEADERS)
+    _wait_for_snapshot(job.json()["change_version"])
+
+    # Другой воркер: пустой кэш процесса.
+    monkeypatch.setattr(main, "metrics_cache", VersionedCache())
+
+    def recompute(*args):
+        raise AssertionError("metrics were recomputed")
+
+    monkeypatch.setattr(main, "_compute_metrics", recompute)
+
+    response = client.get("/metrics", headers=HEADERS)
+
+    assert response.status_code == 200
+    assert [item["count"] for item in response.json()["stage_counts"]] == [1]
@@ -0,0 +1,80 @@
+"""Тесты rate limiting: проверка лимита не держит лишних соединений из пула."""
+
+import pytest
+from sqlalchemy import event
+
+from app.db import engine
+from app.ratelimit import Budget, DatabaseRateLimitBackend, InMemoryRateLimitBackend, rate_limiter
+
+HEADERS = {"X-User-Id": "1"}
+
+
+@pytest.fixture
+def pool_usage():
+    """Сколько раз соединение бралось из пула и максимум одновременно занятых."""
+    usage = {"checkouts": 0, "current": 0, "max": 0}
+
+    def on_checkout(*args):
+        usage["checkouts"] += 1
+        usage["current"] += 1
+        usage["max"] = max(usage["max"], usage["current"])
+
+    def on_checkin(*args):
+        usage["current"] -= 1
+
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+    yield usage
+    event.remove(engine, "checkout", on_checkout)
+    event.remove(engine, "checkin", on_checkin)
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    def configure(backend, budgets=None):
+        monkeypatch.setattr(rate_limiter, "backend", backend)
+        if budgets:
+            monkeypatch.setattr(rate_limiter, "budgets", {**rate_limiter.budgets, **budgets})
+
+    return configure
+
+
+@pytest.mark.parametrize("backend_cls", [InMemoryRateLimitBackend, DatabaseRateLimitBackend])
+def test_request_holds_one_connection_at_a_time(client, pool_usage, limiter, backend_cls):
+    limiter(backend_cls())
+
+    response = client.get("/jobs", headers=HEADERS)
+
+    assert response.status_code == 200
+    assert pool_usage["max"] == 1
+
+
+def test_memory_backend_uses_one_checkout_per_request(client, pool_usage, limiter):
+    limiter(InMemoryRateLimitBackend())
+
+    client.get("/jobs", headers=HEADERS)
+
+    assert pool_usage["checkouts"] == 1
+
+
+def test_throttled_request_does_not_touch_the_pool(client, pool_usage, limiter):
+    limiter(InMemoryRateLimitBackend(), {"expensive": Budget(capacity=1, rate=0.01)})
+    assert client.get("/metrics", headers=HEADERS).status_code == 200
+    pool_usage["checkouts"] = 0
+
+    response = client.get("/metrics", headers=HEADERS)
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert pool_usage["checkouts"] == 0
+
+
+@pytest.mark.parametrize("limited", [False, True])
+def test_memory_backend_keeps_bucket_count_bounded(limited):
+    backend = InMemoryRateLimitBackend(max_keys=10)
+    budget = Budget(capacity=0.0 if limited else 5.0, rate=1.0)
+
+    for user_id in range(50):
+        backend.take(f"cheap:{user_id}", budget)
+
+    assert len(backend._buckets) <= 10
@@ -0,0 +1,24 @@
+"""Тесты delta sync: колоночная загрузка отдает курсор для `/jobs/changes`."""
+
+HEADERS = {"X-User-Id": "1"}
+
+
+def test_columnar_list_cursor_bootstraps_changes(client):
+    for company in ("Alpha", "Beta"):
+        client.post("/jobs", json={"company": company, "position": "Dev"}, headers=HEADERS)
+
+    initial = client.get("/jobs", params={"format": "columnar"}, headers=HEADERS).json()
+    assert initial["count"] == 2
+
+    unchanged = client.get("/jobs/changes", params={"since": initial["cursor"]}, headers=HEADERS)
+    assert unchanged.json()["jobs"] == []
+
+    job_id = initial["columns"]["id"][0]
+    client.patch(f"/jobs/{job_id}", json={"notes": "follow up"}, headers=HEADERS)
+
+    changes = client.get(
+        "/jobs/changes", params={"since": initial["cursor"]}, headers=HEADERS
+    ).json()
+    assert [job["id"] for job in changes["jobs"]] == [job_id]
+    assert changes["jobs"][0]["change_version"] == changes["cursor"]
+    assert changes["cursor"] > initial["cursor"]
@@ -0,0 +1,134 @@
+"""Тесты фоновой очереди задач на in-memory бэкенде."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models import BackgroundTask
+from app.tasks import DatabaseTaskBackend, InMemoryTaskBackend, QueuedTask, TaskQueue
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", future=True)
+    Base.metadata.create_all(engine, tables=[BackgroundTask.__table__])
+    return sessionmaker(bind=engine, future=True)
+
+
+def _make_queue(session_factory, backend=None, **kwargs) -> TaskQueue:
+    return TaskQueue(
+        backend or InMemoryTaskBackend(),
+        session_factory=session_factory,
+        retry_delay=0.01,
+        poll_interval=0.01,
+        **kwargs,
+    )
+
+
+async def _wait_for(predicate, timeout: float = 2.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "condition was not reached in time"
+        await asyncio.sleep(0.01)
+
+
+def test_failed_task_is_retried_until_success(session_factory):
+    queue = _make_queue(session_factory, max_attempts=3)
+    calls = []
+
+    @queue.task("flaky")
+    def flaky(payload):
+        calls.append(payload)
+        if len(calls) < 2:
+            raise RuntimeError("boom")
+
+    async def scenario():
+        await queue.start()
+        with session_factory() as db:
+            queue.enqueue(db, "flaky", {"n": 1})
+            db.commit()
+        await _wait_for(lambda: len(calls) == 2 and not queue._inflight)
+        await queue.stop(timeout=1)
+
+    asyncio.run(scenario())
+    assert calls == [{"n": 1}, {"n": 1}]
+    assert queue.backend.pending() == 0
+
+
+def test_task_is_dropped_after_max_attempts(session_factory):
+    backend = InMemoryTaskBackend()
+    failed = []
+    backend.fail = lambda task, error: failed.append((task.attempts, error))
+    queue = _make_queue(session_factory, backend=backend, max_attempts=3)
+    calls = []
+
+    @queue.task("broken")
+    def broken(payload):
+        calls.append(payload)
+        raise RuntimeError("always")
+
+    async def scenario():
+        await queue.start()
+        with session_factory() as db:
+            queue.enqueue(db, "broken", {})
+            db.commit()
+        await _wait_for(lambda: failed)
+        await asyncio.sleep(0.05)
+        await queue.stop(timeout=1)
+
+    asyncio.run(scenario())
+    assert len(calls) == 3
+    assert failed == [(3, "RuntimeError('always')")]
+    assert backend.pending() == 0
+
+
+def test_stop_drains_pending_tasks(session_factory):
+    queue = _make_queue(session_factory, concurrency=1)
+    done = []
+
+    @queue.task("slow")
+    def slow(payload):
+        done.append(payload["n"])
+
+    async def scenario():
+        await queue.start()
+        # Поставить задачи в момент остановки: цикл выдачи уже не успеет их взять.
+        with session_factory() as db:
+            for n in range(5):
+                queue.enqueue(db, "slow", {"n": n})
+            db.commit()
+        await queue.stop(timeout=2)
+
+    asyncio.run(scenario())
+    assert sorted(done) == [0, 1, 2, 3, 4]
+    assert queue.backend.pending() == 0
+
+
+def test_rollback_discards_staged_tasks(session_factory):
+    queue = _make_queue(session_factory)
+    queue.task("noop")(lambda payload: None)
+
+    with session_factory() as db:
+        queue.enqueue(db, "noop", {})
+        db.rollback()
+        db.commit()
+
+    assert queue.backend.pending() == 0
+
+
+def test_database_backend_reclaims_tasks_after_visibility_timeout(session_factory):
+    backend = DatabaseTaskBackend(session_factory, visibility_timeout=0)
+    with session_factory() as db:
+        backend.stage(db, QueuedTask(name="noop", payload={}, run_after=datetime.utcnow()))
+        db.commit()
+
+    first = backend.claim(10)
+    second = backend.claim(10)
+
+    assert [task.attempts for task in first] == [1]
+    assert [(task.id, task.attempts) for task in second] == [(first[0].id, 2)]